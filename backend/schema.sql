@@ -8,7 +8,6 @@ CREATE TABLE IF NOT EXISTS users (
   last_name VARCHAR(100),
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  INDEX idx_email (email),
   INDEX idx_role (role)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -21,13 +20,15 @@ CREATE TABLE IF NOT EXISTS conversations (
   patient_language VARCHAR(10) NOT NULL,
   status ENUM('active', 'ended', 'archived') DEFAULT 'active',
   title VARCHAR(255),
+  message_count INT NOT NULL DEFAULT 0,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   ended_at TIMESTAMP NULL,
   FOREIGN KEY (doctor_id) REFERENCES users(id) ON DELETE CASCADE,
   FOREIGN KEY (patient_id) REFERENCES users(id) ON DELETE CASCADE,
-  INDEX idx_doctor (doctor_id),
-  INDEX idx_patient (patient_id),
+  INDEX idx_doctor_created (doctor_id, created_at),
+  INDEX idx_patient_created (patient_id, created_at),
+  INDEX idx_doctor_patient_status (doctor_id, patient_id, status),
   INDEX idx_status (status),
   INDEX idx_created (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -46,11 +47,45 @@ CREATE TABLE IF NOT EXISTS messages (
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
   FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE CASCADE,
-  INDEX idx_conversation (conversation_id),
+  INDEX idx_conversation_created (conversation_id, created_at),
   INDEX idx_sender (sender_id),
-  INDEX idx_created (created_at)
+  INDEX idx_created (created_at),
+  FULLTEXT INDEX ft_text (original_text, translated_text)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Keep conversations.message_count in step with messages, whichever backend writes them.
+-- Databases created before the counter existed get the column here, since
+-- CREATE TABLE IF NOT EXISTS above leaves an existing conversations table alone.
+SET @add_message_count := (
+  SELECT COUNT(*) = 0 FROM information_schema.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'conversations' AND COLUMN_NAME = 'message_count'
+);
+SET @backfill_message_count := @add_message_count OR (
+  SELECT COUNT(*) < 2 FROM information_schema.TRIGGERS
+  WHERE TRIGGER_SCHEMA = DATABASE()
+    AND TRIGGER_NAME IN ('trg_messages_count_insert', 'trg_messages_count_delete')
+);
+SET @ddl := IF(@add_message_count,
+  'ALTER TABLE conversations ADD COLUMN message_count INT NOT NULL DEFAULT 0 AFTER title',
+  'DO 0');
+PREPARE add_message_count FROM @ddl;
+EXECUTE add_message_count;
+DEALLOCATE PREPARE add_message_count;
+
+-- IF NOT EXISTS (MySQL 8.0.29+) leaves existing triggers in place, so no insert goes uncounted on re-runs
+CREATE TRIGGER IF NOT EXISTS trg_messages_count_insert AFTER INSERT ON messages
+FOR EACH ROW
+  UPDATE conversations SET message_count = message_count + 1 WHERE id = NEW.conversation_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_messages_count_delete AFTER DELETE ON messages
+FOR EACH ROW
+  UPDATE conversations SET message_count = GREATEST(message_count - 1, 0) WHERE id = OLD.conversation_id;
+
+-- Backfill once, after the triggers exist, when the column or a trigger was missing
+UPDATE conversations c
+SET message_count = (SELECT COUNT(*) FROM messages m WHERE m.conversation_id = c.id)
+WHERE @backfill_message_count;
+
 -- Summaries table
 CREATE TABLE IF NOT EXISTS summaries (
   id INT AUTO_INCREMENT PRIMARY KEY,
@@ -63,8 +98,23 @@ CREATE TABLE IF NOT EXISTS summaries (
   generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   generated_by INT,
   FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
-  FOREIGN KEY (generated_by) REFERENCES users(id) ON DELETE SET NULL,
-  INDEX idx_conversation (conversation_id)
+  FOREIGN KEY (generated_by) REFERENCES users(id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Translation cache (shared by app processes; keyed on SHA-256 of the stripped source text).
+-- Rows go away with their conversation and are pruned by age (TRANSLATION_CACHE_RETENTION_DAYS)
+CREATE TABLE IF NOT EXISTS translation_cache (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  text_hash CHAR(64) NOT NULL,
+  source_language VARCHAR(10) NOT NULL,
+  target_language VARCHAR(10) NOT NULL,
+  source_text TEXT NOT NULL,
+  translated_text TEXT NOT NULL,
+  conversation_id INT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
+  UNIQUE KEY uniq_translation (text_hash, source_language, target_language),
+  INDEX idx_created (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Insert demo users (password: password)
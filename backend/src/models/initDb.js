@@ -13,7 +13,6 @@ async function initializeDatabase() {
         last_name VARCHAR(100),
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-        INDEX idx_email (email),
         INDEX idx_role (role)
       ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
     `);
@@ -28,13 +27,15 @@ async function initializeDatabase() {
         patient_language VARCHAR(10) NOT NULL,
         status ENUM('active', 'ended', 'archived') DEFAULT 'active',
         title VARCHAR(255),
+        message_count INT NOT NULL DEFAULT 0,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
         ended_at TIMESTAMP NULL,
         FOREIGN KEY (doctor_id) REFERENCES users(id) ON DELETE CASCADE,
         FOREIGN KEY (patient_id) REFERENCES users(id) ON DELETE CASCADE,
-        INDEX idx_doctor (doctor_id),
-        INDEX idx_patient (patient_id),
+        INDEX idx_doctor_created (doctor_id, created_at),
+        INDEX idx_patient_created (patient_id, created_at),
+        INDEX idx_doctor_patient_status (doctor_id, patient_id, status),
         INDEX idx_status (status),
         INDEX idx_created (created_at)
       ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
@@ -55,12 +56,49 @@ async function initializeDatabase() {
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
         FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE CASCADE,
-        INDEX idx_conversation (conversation_id),
+        INDEX idx_conversation_created (conversation_id, created_at),
         INDEX idx_sender (sender_id),
-        INDEX idx_created (created_at)
+        INDEX idx_created (created_at),
+        FULLTEXT INDEX ft_text (original_text, translated_text)
       ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
     `);
 
+    // Keep conversations.message_count in step with messages, whichever backend writes them.
+    // CREATE TABLE IF NOT EXISTS leaves an older conversations table alone, so add the column here
+    const [counterColumns] = await pool.query(`
+      SELECT COUNT(*) AS count FROM information_schema.COLUMNS
+      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'conversations' AND COLUMN_NAME = 'message_count'
+    `);
+    const addCounter = counterColumns[0].count === 0;
+    if (addCounter) {
+      await pool.query('ALTER TABLE conversations ADD COLUMN message_count INT NOT NULL DEFAULT 0 AFTER title');
+    }
+
+    const [counterTriggers] = await pool.query(`
+      SELECT COUNT(*) AS count FROM information_schema.TRIGGERS
+      WHERE TRIGGER_SCHEMA = DATABASE()
+        AND TRIGGER_NAME IN ('trg_messages_count_insert', 'trg_messages_count_delete')
+    `);
+    // IF NOT EXISTS (MySQL 8.0.29+) leaves existing triggers in place, so no insert goes uncounted on re-runs
+    await pool.query(`
+      CREATE TRIGGER IF NOT EXISTS trg_messages_count_insert AFTER INSERT ON messages
+      FOR EACH ROW
+        UPDATE conversations SET message_count = message_count + 1 WHERE id = NEW.conversation_id
+    `);
+    await pool.query(`
+      CREATE TRIGGER IF NOT EXISTS trg_messages_count_delete AFTER DELETE ON messages
+      FOR EACH ROW
+        UPDATE conversations SET message_count = GREATEST(message_count - 1, 0) WHERE id = OLD.conversation_id
+    `);
+
+    // Backfill once, after the triggers exist, when the column or a trigger was missing
+    if (addCounter || counterTriggers[0].count < 2) {
+      await pool.query(`
+        UPDATE conversations c
+        SET message_count = (SELECT COUNT(*) FROM messages m WHERE m.conversation_id = c.id)
+      `);
+    }
+
     // Create summaries table
     await pool.query(`
       CREATE TABLE IF NOT EXISTS summaries (
@@ -74,8 +112,24 @@ async function initializeDatabase() {
         generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         generated_by INT,
         FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
-        FOREIGN KEY (generated_by) REFERENCES users(id) ON DELETE SET NULL,
-        INDEX idx_conversation (conversation_id)
+        FOREIGN KEY (generated_by) REFERENCES users(id) ON DELETE SET NULL
+      ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    `);
+
+    // Create translation cache table (rows are deleted with their conversation and pruned by age)
+    await pool.query(`
+      CREATE TABLE IF NOT EXISTS translation_cache (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        text_hash CHAR(64) NOT NULL,
+        source_language VARCHAR(10) NOT NULL,
+        target_language VARCHAR(10) NOT NULL,
+        source_text TEXT NOT NULL,
+        translated_text TEXT NOT NULL,
+        conversation_id INT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
+        UNIQUE KEY uniq_translation (text_hash, source_language, target_language),
+        INDEX idx_created (created_at)
       ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
     `);
 
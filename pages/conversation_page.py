@@ -1,15 +1,17 @@
 """
 Conversation/Chat page
 """
+import re
+import html
 import streamlit as st
 from datetime import datetime
 from utils.database import (
     get_conversation_by_id,
-    get_messages_by_conversation,
+    get_conversation_stamp,
     create_message,
-    get_summary_by_conversation,
     create_summary
 )
+from utils.database_cached import cached_messages, cached_summary
 from utils.session import (
     get_current_user,
     get_selected_conversation,
@@ -17,10 +19,37 @@ from utils.session import (
     has_role,
     clear_conversation
 )
-from utils.translation import translate_text, get_language_name, get_language_options
+from utils.translation import translate_text, translate_texts, get_language_name, get_language_options
+from utils.formatting import parse_datetime
 from utils.database import get_all_patients
 import random
 
+# Keywords for mock symptom extraction (in production, use NLP)
+SYMPTOM_KEYWORDS = ('pain', 'headache', 'fever', 'nausea', 'fatigue', 'cough', 'dizziness')
+# Substring match (no word boundaries) so e.g. "painful" still counts as pain
+SYMPTOM_RE = re.compile('|'.join(map(re.escape, SYMPTOM_KEYWORDS)))
+
+# Chat bubble templates (own messages vs. the other participant's)
+_OWN_TPL = ("<div class='message-bubble message-own'>"
+            "<strong>You ({role})</strong><br/>"
+            "<small>{ts}</small><br/><br/>{body}</div>")
+_OTHER_TPL = ("<div class='message-bubble message-other'>"
+              "<strong>{sender} ({role})</strong><br/>"
+              "<small>{ts}</small><br/><br/>{body}</div>")
+
+# Structured summary fields and their headings, in display order
+SUMMARY_SECTIONS = (
+    ('symptoms', '🩺 Symptoms'),
+    ('diagnosis', '🔍 Diagnosis'),
+    ('medications', '💊 Medications'),
+    ('follow_up_actions', '📅 Follow-up Actions'),
+)
+
+
+def _to_html(text):
+    """Escape text for inline HTML, keeping line breaks"""
+    return html.escape(text or '').replace("\n", "<br/>")
+
 
 def show():
     """Main conversation page"""
@@ -40,7 +69,7 @@ def show():
 
     with col1:
         st.title(f"💬 Consultation #{conv['id']}")
-        st.caption(f"Started: {datetime.strptime(conv['created_at'], '%Y-%m-%d %H:%M:%S').strftime('%B %d, %Y at %I:%M %p')}")
+        st.caption(f"Started: {parse_datetime(conv['created_at']).strftime('%B %d, %Y at %I:%M %p')}")
 
     with col2:
         if st.button("← Back to Dashboard", use_container_width=True):
@@ -85,37 +114,31 @@ def show():
         show_details_tab(conv)
 
 
+@st.fragment
 def show_chat_tab(conv, user, is_doctor):
     """Show chat interface"""
 
     # Load messages
-    messages = get_messages_by_conversation(conv['id'])
+    messages = cached_messages(conv['id'], get_conversation_stamp(conv['id']))
 
     # Display messages
-    if not messages:
+    if messages.empty:
         st.info("No messages yet. Start the conversation!")
     else:
-        for msg in messages:
-            is_own = msg['sender_id'] == user['id']
-
-            # Determine message style
-            if is_own:
-                st.markdown(f"""
-                <div class="message-bubble message-own">
-                    <strong>You ({msg['sender_role']})</strong><br/>
-                    <small>{msg.get('created_at', '')}</small><br/><br/>
-                    {msg.get('translated_text', msg.get('original_text', ''))}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                sender_name = msg.get('sender_first_name', 'Unknown')
-                st.markdown(f"""
-                <div class="message-bubble message-other">
-                    <strong>{sender_name} ({msg['sender_role']})</strong><br/>
-                    <small>{msg.get('created_at', '')}</small><br/><br/>
-                    {msg.get('translated_text', msg.get('original_text', ''))}
-                </div>
-                """, unsafe_allow_html=True)
+        # Build all bubbles into one HTML block so the page ships a single element
+        uid = user['id']
+        html_parts = [
+            (_OWN_TPL if msg.sender_id == uid else _OTHER_TPL).format(
+                sender=html.escape(msg.sender_first_name or 'Unknown'),
+                role=msg.sender_role,
+                ts=msg.created_at,
+                body=_to_html(msg.translated_text or msg.original_text)
+            )
+            for msg in messages.itertuples(index=False)
+        ]
+
+        # No fixed-height scroller: it opens at the top, hiding the newest messages
+        st.markdown("".join(html_parts), unsafe_allow_html=True)
 
     st.markdown("---")
 
@@ -140,7 +163,7 @@ def show_chat_tab(conv, user, is_doctor):
                 with col1:
                     if st.form_submit_button("Preview Translation", use_container_width=True):
                         with st.spinner("Translating..."):
-                            translated = translate_text(message_text, target_lang, 'en')
+                            translated = translate_text(message_text, target_lang, 'en', conv['id'])
                             st.info(f"🌐 Translation to {lang_name}:\n\n{translated}")
 
             col1, col2 = st.columns(2)
@@ -172,7 +195,7 @@ def send_message(conv, user, message_text, should_translate):
                 target_lang = 'en'
                 source_lang = conv.get('patient_language', 'en')
 
-            translated = translate_text(message_text, target_lang, source_lang)
+            translated = translate_text(message_text, target_lang, source_lang, conv['id'])
             original_text = message_text
             translated_text = translated
         else:
@@ -190,7 +213,7 @@ def send_message(conv, user, message_text, should_translate):
 
         if msg_id:
             st.success("Message sent!")
-            st.rerun()
+            st.rerun(scope="fragment")
         else:
             st.error("Failed to send message")
 
@@ -198,36 +221,29 @@ def send_message(conv, user, message_text, should_translate):
         st.error(f"Error sending message: {str(e)}")
 
 
+@st.fragment
 def show_summary_tab(conv, user, is_doctor):
     """Show summary tab"""
 
-    summary = get_summary_by_conversation(conv['id'])
+    summary = cached_summary(conv['id'], get_conversation_stamp(conv['id']))
 
     if summary:
         st.subheader("Medical Summary")
 
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Generated", datetime.strptime(summary['generated_at'], '%Y-%m-%d %H:%M:%S').strftime('%B %d, %Y'))
+            st.metric("Generated", parse_datetime(summary['generated_at']).strftime('%B %d, %Y'))
 
         st.markdown("---")
 
-        # Display summary sections
-        if summary.get('symptoms'):
-            st.subheader("🩺 Symptoms")
-            st.write(summary['symptoms'])
-
-        if summary.get('diagnosis'):
-            st.subheader("🔍 Diagnosis")
-            st.write(summary['diagnosis'])
-
-        if summary.get('medications'):
-            st.subheader("💊 Medications")
-            st.write(summary['medications'])
-
-        if summary.get('follow_up_actions'):
-            st.subheader("📅 Follow-up Actions")
-            st.write(summary['follow_up_actions'])
+        # Display summary sections as a single element
+        sections_html = "".join(
+            f"<h3>{heading}</h3><p>{_to_html(summary[field])}</p>"
+            for field, heading in SUMMARY_SECTIONS
+            if summary.get(field)
+        )
+        if sections_html:
+            st.markdown(sections_html, unsafe_allow_html=True)
 
         st.markdown("---")
         st.subheader("📝 Full Summary")
@@ -253,30 +269,33 @@ def show_summary_tab(conv, user, is_doctor):
 def generate_ai_summary(conv, user):
     """Generate AI summary for the conversation"""
     try:
-        with st.spinner("Generating summary..."):
+        with st.status("Generating summary...", expanded=True) as status:
             # Get messages
-            messages = get_messages_by_conversation(conv['id'])
+            st.write("Loading messages...")
+            messages = cached_messages(conv['id'], get_conversation_stamp(conv['id']))
 
-            if not messages:
-                st.warning("No messages to summarize.")
+            if messages.empty:
+                status.update(label="No messages to summarize.", state="error")
                 return
 
-            # Build conversation transcript
-            transcript = "\n".join([
-                f"{msg.get('sender_first_name', 'Unknown')}: {msg.get('original_text', '')}"
-                for msg in messages
-            ])
+            # translate_texts runs its HTTP calls concurrently; cache writes stay on this thread
+            st.write("Preparing English transcript...")
+            english_texts = get_english_texts(messages, conv)
 
             # Generate mock summary (in production, use actual AI API)
             summary_content = generate_mock_summary(messages, conv)
 
-            # Create structured summary
-            symptoms = extract_symptoms(messages)
-            diagnosis = extract_diagnosis(messages)
-            medications = extract_medications(messages)
-            follow_up = extract_follow_up(messages)
+            # Create structured summary from the English transcript
+            # (lowercased once into a single buffer shared by every extractor)
+            st.write("Extracting symptoms, diagnosis, medications and follow-up...")
+            text_lc = "\n".join(english_texts).lower()
+            symptoms = extract_symptoms(text_lc)
+            diagnosis = extract_diagnosis(text_lc)
+            medications = extract_medications(text_lc)
+            follow_up = extract_follow_up(text_lc)
 
             # Save summary
+            st.write("Saving summary...")
             summary_id = create_summary(
                 conv['id'],
                 summary_content,
@@ -288,10 +307,10 @@ def generate_ai_summary(conv, user):
             )
 
             if summary_id:
-                st.success("Summary generated successfully!")
+                status.update(label="Summary generated successfully!", state="complete")
                 st.rerun()
             else:
-                st.error("Failed to save summary")
+                status.update(label="Failed to save summary", state="error")
 
     except Exception as e:
         st.error(f"Error generating summary: {str(e)}")
@@ -316,9 +335,9 @@ Key Discussion Points:
 """
 
     # Extract some key points from messages
-    for i, msg in enumerate(messages[:5], 1):
-        speaker = msg.get('sender_first_name', 'Unknown')
-        text = msg.get('original_text', '')[:100]
+    for i, msg in enumerate(messages.head(5).itertuples(index=False), 1):
+        speaker = msg.sender_first_name or 'Unknown'
+        text = (msg.original_text or '')[:100]
         summary += f"\n{i}. {speaker}: {text}..."
 
     summary += f"""
@@ -336,38 +355,56 @@ Next Steps:
     return summary
 
 
-def extract_symptoms(messages):
-    """Extract symptoms from messages (mock implementation)"""
-    symptoms_list = []
-    for msg in messages:
-        text = msg.get('original_text', '').lower()
-        # Simple keyword matching (in production, use NLP)
-        symptom_keywords = ['pain', 'headache', 'fever', 'nausea', 'fatigue', 'cough', 'dizziness']
-        for keyword in symptom_keywords:
-            if keyword in text and keyword not in symptoms_list:
-                symptoms_list.append(keyword.capitalize())
+def get_english_texts(messages, conv):
+    """Get message texts in English, batch-translating untranslated patient messages"""
+    patient_lang = conv.get('patient_language', 'en')
+    texts = []
+    pending = []
+    for msg in messages.itertuples(index=False):
+        original = msg.original_text or ''
+        translated = msg.translated_text or original
+        if msg.sender_role != 'patient' or patient_lang == 'en':
+            texts.append(original)
+        elif translated != original:
+            texts.append(translated)
+        else:
+            pending.append(len(texts))
+            texts.append(original)
+
+    # One batched translation call instead of one per message
+    if pending:
+        translated = translate_texts([texts[i] for i in pending], 'en', patient_lang, conv['id'])
+        for i, text in zip(pending, translated):
+            texts[i] = text
+    return texts
+
+
+def extract_symptoms(text_lc):
+    """Extract symptoms from the lowercased transcript (mock implementation)"""
+    # Single regex pass over all messages
+    hits = {match.group(0) for match in SYMPTOM_RE.finditer(text_lc)}
+    symptoms_list = [keyword.capitalize() for keyword in SYMPTOM_KEYWORDS if keyword in hits]
     return ", ".join(symptoms_list) if symptoms_list else "Not specified"
 
 
-def extract_diagnosis(messages):
-    """Extract diagnosis from messages (mock implementation)"""
+def extract_diagnosis(text_lc):
+    """Extract diagnosis from the lowercased transcript (mock implementation)"""
     return "Under evaluation - follow-up recommended"
 
 
-def extract_medications(messages):
-    """Extract medications from messages (mock implementation)"""
-    meds = []
-    for msg in messages:
-        if 'medication' in msg.get('original_text', '').lower():
-            meds.append("Prescribed medication mentioned")
-    return ", ".join(meds) if meds else "No medications prescribed in this consultation"
+def extract_medications(text_lc):
+    """Extract medications from the lowercased transcript (mock implementation)"""
+    if 'medication' in text_lc:
+        return "Prescribed medication mentioned"
+    return "No medications prescribed in this consultation"
 
 
-def extract_follow_up(messages):
-    """Extract follow-up actions from messages (mock implementation)"""
+def extract_follow_up(text_lc):
+    """Extract follow-up actions from the lowercased transcript (mock implementation)"""
     return "Schedule follow-up appointment in 1-2 weeks if symptoms persist"
 
 
+@st.fragment
 def show_details_tab(conv):
     """Show conversation details"""
     st.subheader("Conversation Details")
@@ -386,11 +423,11 @@ def show_details_tab(conv):
 
     st.markdown("---")
 
-    created = datetime.strptime(conv['created_at'], '%Y-%m-%d %H:%M:%S')
+    created = parse_datetime(conv['created_at'])
     st.metric("Created", created.strftime('%B %d, %Y at %I:%M %p'))
 
     if conv.get('ended_at'):
-        ended = datetime.strptime(conv['ended_at'], '%Y-%m-%d %H:%M:%S')
+        ended = parse_datetime(conv['ended_at'])
         st.metric("Ended", ended.strftime('%B %d, %Y at %I:%M %p'))
 
     st.metric("Title", conv.get('title', 'N/A'))
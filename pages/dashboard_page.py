@@ -4,30 +4,30 @@ Dashboard page showing conversations list
 import streamlit as st
 from datetime import datetime
 from utils.database import (
-    get_conversations_by_user,
+    get_conversations_stamp,
     create_conversation,
     get_active_conversation,
     update_conversation_status,
-    get_all_patients,
     get_user_by_id
 )
+from utils.database_cached import cached_conversations, cached_search, cached_patients
 from utils.session import (
     get_current_user,
     set_current_page,
     set_selected_conversation,
     has_role,
     logout_user,
-    refresh_data,
-    get_language_options
+    refresh_data
 )
-from utils.translation import get_language_name
+from utils.translation import get_language_name, get_language_options
+from utils.formatting import parse_datetime
 
 
 def format_date(date_str):
     """Format date to relative time"""
     if not date_str:
         return "Unknown"
-    dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S") if isinstance(date_str, str) else date_str
+    dt = parse_datetime(date_str)
     now = datetime.now()
     diff = now - dt
     hours = diff.total_seconds() / 3600
@@ -55,11 +55,13 @@ def show_conversation_card(conv):
     status = conv.get('status', 'active')
     status_class = 'status-active' if status == 'active' else 'status-ended'
 
+    title = conv.get('title', f"Consultation #{conv['id']}")
+
     # Create clickable card
     col1, col2, col3 = st.columns([3, 2, 1])
 
     with col1:
-        st.markdown(f"**{conv.get('title', f'Consultation #{conv[\"id\"]}')}**")
+        st.markdown(f"**{title}**")
         st.caption(f"👤 {participant_name}")
 
     with col2:
@@ -88,7 +90,7 @@ def show_new_conversation_modal():
             )
 
             # Get patients (for doctors)
-            patients = get_all_patients()
+            patients = cached_patients()
             if patients:
                 patient_options = {f"{p['first_name']} {p['last_name']} ({p['email']})": p['id']
                                    for p in patients}
@@ -98,6 +100,7 @@ def show_new_conversation_modal():
                     key="new_conv_patient"
                 )
             else:
+                patient_options = {}
                 st.warning("No patients found. Using demo patient.")
                 selected_patient = "Demo Patient (patient@demo.com)"
 
@@ -179,15 +182,22 @@ def show():
         show_new_conversation_modal()
         st.markdown("---")
 
+    show_conversation_list(user)
+
+
+@st.fragment
+def show_conversation_list(user):
+    """Show search box and conversations list as an isolated fragment"""
     # Search
     search_term = st.text_input("🔍 Search conversations...", placeholder="Search by name, title...")
 
-    # Load conversations
-    conversations = get_conversations_by_user(user['id'], user['role'])
-
+    # Load conversations (only run the search query when there is a term)
+    search_term = search_term.strip()
+    stamp = get_conversations_stamp(user['id'], user['role'])
     if search_term:
-        from utils.database import search_conversations
-        conversations = search_conversations(user['id'], user['role'], search_term)
+        conversations = cached_search(user['id'], user['role'], search_term, stamp)
+    else:
+        conversations = cached_conversations(user['id'], user['role'], stamp)
 
     # Display conversations
     if not conversations:
@@ -210,14 +220,8 @@ def show():
 
                 # Add click handler
                 if st.button(f"View Conversation {conv['id']}", key=f"view_{conv['id']}", use_container_width=True):
-                    conv_details = get_conversation_by_id(conv['id'], user['id'])
-                    if conv_details:
-                        set_selected_conversation(conv_details)
-                        set_current_page('conversation')
-                        st.rerun()
-
-
-def get_conversation_by_id(conv_id, user_id):
-    """Helper to get conversation details"""
-    from utils.database import get_conversation_by_id as get_conv
-    return get_conv(conv_id, user_id)
+                    # List rows already carry the full conversation details
+                    # (already scoped to this user), so no extra query is needed
+                    set_selected_conversation(conv)
+                    set_current_page('conversation')
+                    st.rerun()
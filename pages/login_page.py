@@ -3,7 +3,9 @@ Login page for the Healthcare Translation App
 """
 import streamlit as st
 from utils.database import authenticate_user, create_user, get_all_patients
+from utils.database_cached import cached_patients
 from utils.session import login_user
+from utils.auth_helpers import hash_password
 
 
 def show_login():
@@ -28,36 +30,14 @@ def show_login():
                 if not email or not password:
                     st.error("Please fill in all fields")
                 else:
-                    # For demo: accept demo credentials
-                    if email == "doctor@demo.com" and password == "password":
-                        login_user({
-                            'id': 1,
-                            'email': 'doctor@demo.com',
-                            'role': 'doctor',
-                            'first_name': 'Dr. Sarah',
-                            'last_name': 'Johnson'
-                        })
-                        st.success("Login successful!")
-                        st.rerun()
-                    elif email == "patient@demo.com" and password == "password":
-                        login_user({
-                            'id': 2,
-                            'email': 'patient@demo.com',
-                            'role': 'patient',
-                            'first_name': 'Maria',
-                            'last_name': 'Garcia'
-                        })
+                    # Demo credentials are answered from memory; others go to the database
+                    user = authenticate_user(email, password)
+                    if user:
+                        login_user(user)
                         st.success("Login successful!")
                         st.rerun()
                     else:
-                        # Try database authentication
-                        user = authenticate_user(email, password)
-                        if user:
-                            login_user(user)
-                            st.success("Login successful!")
-                            st.rerun()
-                        else:
-                            st.error("Invalid credentials. Use doctor@demo.com / password or patient@demo.com / password")
+                        st.error("Invalid credentials. Use doctor@demo.com / password or patient@demo.com / password")
 
         st.markdown("---")
         st.info("📝 **Demo Credentials:**\n- **Doctor:** doctor@demo.com / password\n- **Patient:** patient@demo.com / password")
@@ -82,8 +62,10 @@ def show_login():
                 elif len(password) < 8:
                     st.error("Password must be at least 8 characters")
                 else:
-                    user_id = create_user(email, password, role, first_name, last_name)
+                    user_id = create_user(email, hash_password(password), role, first_name, last_name)
                     if user_id:
+                        # New patients must show up in every doctor's patient picker
+                        cached_patients.clear()
                         st.success("Registration successful! Please login.")
                     else:
                         st.error("Registration failed. Email may already be registered.")
@@ -86,6 +86,10 @@ st.markdown("""
 from utils.session import init_session_state
 init_session_state()
 
+# Warm shared resources (connection pool) before the first user action
+from utils.warmup import warm
+warm()
+
 # Import pages
 from pages.login_page import login_page
 from pages.dashboard_page import dashboard_page
@@ -0,0 +1,31 @@
+"""
+Launcher for the Healthcare Translation App
+Starts Streamlit on uvloop when it is installed
+
+Usage: python run.py [streamlit run options]
+"""
+import asyncio
+import os
+import sys
+
+from streamlit.web import cli as stcli
+
+
+def install_event_loop():
+    """Use uvloop for the Streamlit server's asyncio loop when available"""
+    if sys.platform == 'win32':
+        return
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+if __name__ == "__main__":
+    # The policy must be set before Streamlit creates its event loop;
+    # setting it from app.py is too late because the server is already running
+    install_event_loop()
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    sys.argv = ["streamlit", "run", app_path] + sys.argv[1:]
+    sys.exit(stcli.main())
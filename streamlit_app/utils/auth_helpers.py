@@ -1,23 +1,35 @@
 """
 Authentication helper functions - simplified for demo
 """
+import hashlib
+import hmac
+import string
+import bcrypt
 from utils.database import create_user, get_user_by_id
 
+# bcrypt work factor for newly hashed passwords
+BCRYPT_ROUNDS = 12
+
+_HEX_DIGITS = frozenset(string.hexdigits)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with bcrypt"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
 
 def ensure_demo_users():
     """Ensure demo users exist in the database"""
-    import hashlib
-
-    def simple_hash(password):
-        """Simple hash for demo (in production use bcrypt)"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    # Both demo accounts share the same password, so hash it only once
+    demo_hash = None
 
     # Check and create doctor user
     doctor = get_user_by_id(1)
     if not doctor:
+        demo_hash = demo_hash or hash_password('password')
         create_user(
             email='doctor@demo.com',
-            password=simple_hash('password'),
+            password=demo_hash,
             role='doctor',
             first_name='Dr. Sarah',
             last_name='Johnson'
@@ -27,9 +39,10 @@ def ensure_demo_users():
     # Check and create patient user
     patient = get_user_by_id(2)
     if not patient:
+        demo_hash = demo_hash or hash_password('password')
         create_user(
             email='patient@demo.com',
-            password=simple_hash('password'),
+            password=demo_hash,
             role='patient',
             first_name='Maria',
             last_name='Garcia'
@@ -37,7 +50,27 @@ def ensure_demo_users():
         print('Created demo patient user')
 
 
+def needs_rehash(stored_password: str) -> bool:
+    """Whether a verified stored password is in a legacy format (SHA-256 or plain text)"""
+    return not stored_password.startswith('$2')
+
+
 def verify_password(password, stored_password):
-    """Verify password (simplified for demo)"""
-    import hashlib
-    return hashlib.sha256(password.encode()).hexdigest() == stored_password
+    """Verify password against a bcrypt hash, a legacy SHA-256 digest or a legacy plain-text row"""
+    if not stored_password:
+        return False
+
+    if stored_password.startswith('$2'):
+        try:
+            return bcrypt.checkpw(password.encode(), stored_password.encode())
+        except ValueError:
+            # Malformed hash (e.g. placeholder seed rows)
+            return False
+
+    # Legacy rows hashed with unsalted SHA-256
+    if len(stored_password) == 64 and _HEX_DIGITS.issuperset(stored_password):
+        digest = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(digest, stored_password.lower())
+
+    # Legacy plain-text rows; never compare against a hash, or the hash itself would log in
+    return hmac.compare_digest(stored_password.encode(), password.encode())
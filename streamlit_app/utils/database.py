@@ -2,8 +2,13 @@
 Database connection and query utilities for the Healthcare Translation App
 """
 import os
+import re
+import threading
+import streamlit as st
+from collections import OrderedDict
+from contextlib import contextmanager
 import mysql.connector
-from mysql.connector import pooling
+from mysql.connector import errorcode, pooling
 from dotenv import load_dotenv
 import pandas as pd
 from datetime import datetime
@@ -11,38 +16,128 @@ from typing import List, Dict, Optional, Tuple
 
 load_dotenv()
 
+# mysql-connector caps pools at 32 connections
+MAX_POOL_SIZE = 32
+
+# Prepared cursors kept per (connection, SQL); sized for every hot query on every pooled connection
+PREPARED_CACHE_SIZE = 1024
+
+# Errors after which a prepared statement is re-prepared and run once more:
+# the server forgot the statement, or the connection dropped (reconnected first)
+_STALE_STATEMENT_ERRORS = {errorcode.ER_UNKNOWN_STMT_HANDLER}
+_LOST_CONNECTION_ERRORS = {errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST}
+
+# Connection settings, read from the environment once at import
+_DB_CONFIG = {
+    'host': os.getenv('DATABASE_HOST', 'localhost'),
+    'port': int(os.getenv('DATABASE_PORT', 3306)),
+    'user': os.getenv('DATABASE_USER', 'root'),
+    'password': os.getenv('DATABASE_PASSWORD', ''),
+    'database': os.getenv('DATABASE_NAME', 'healthcare_translation'),
+    'charset': 'utf8mb4',
+    'collation': 'utf8mb4_unicode_ci',
+    'autocommit': True,
+    'connection_timeout': int(os.getenv('DATABASE_CONNECT_TIMEOUT', 5)),
+    # Reused prepared cursors must not be blocked by rows left after fetchone()
+    'consume_results': True,
+}
+# Sized for concurrent Streamlit sessions; session reset is skipped
+# because every statement autocommits or runs in transaction(), and it
+# would discard the prepared statements DatabaseManager keeps per connection
+_POOL_SIZE = min(int(os.getenv('DATABASE_POOL_SIZE', 20)), MAX_POOL_SIZE)
+_POOL_RESET_SESSION = os.getenv('DATABASE_POOL_RESET_SESSION', 'false').lower() == 'true'
+
 
 class DatabaseManager:
     """Manages database connections and operations"""
 
-    def __init__(self):
-        self.config = {
-            'host': os.getenv('DATABASE_HOST', 'localhost'),
-            'port': int(os.getenv('DATABASE_PORT', 3306)),
-            'user': os.getenv('DATABASE_USER', 'root'),
-            'password': os.getenv('DATABASE_PASSWORD', ''),
-            'database': os.getenv('DATABASE_NAME', 'healthcare_translation'),
-            'charset': 'utf8mb4',
-            'collation': 'utf8mb4_unicode_ci',
-            'autocommit': True,
-        }
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = dict(config or _DB_CONFIG)
         self.connection_pool = pooling.MySQLConnectionPool(
             pool_name="healthcare_pool",
-            pool_size=5,
+            pool_size=_POOL_SIZE,
+            pool_reset_session=_POOL_RESET_SESSION,
             **self.config
         )
+        # A session reset on checkout drops every server-side prepared statement,
+        # so cached prepared cursors are only used when resets are off
+        self.reuse_prepared = not _POOL_RESET_SESSION
+        self._prepared_cursors: "OrderedDict[Tuple[int, str], Tuple]" = OrderedDict()
+        self._prepared_lock = threading.Lock()
 
     def get_connection(self):
         """Get a connection from the pool"""
         return self.connection_pool.get_connection()
 
-    def execute_query(self, query: str, params: Optional[tuple] = None, fetch_one: bool = False) -> List[Dict]:
-        """Execute a SELECT query and return results as list of dictionaries"""
+    def _prepared_cursor(self, conn, query: str, dictionary: bool):
+        """
+        Get a prepared cursor for query on this pooled connection
+
+        The driver only skips re-preparing when the same SQL string object is
+        executed again on the same cursor, so cursors are cached per underlying
+        connection. A string literal in a function body is a code constant,
+        i.e. the same object on every call.
+        """
+        cnx = getattr(conn, '_cnx', conn)
+        key = (id(cnx), query, dictionary)
+        with self._prepared_lock:
+            entry = self._prepared_cursors.get(key)
+            if entry and entry[0] is cnx:
+                self._prepared_cursors.move_to_end(key)
+                return entry[1]
+
+        cursor = conn.cursor(prepared=True, dictionary=dictionary)
+        with self._prepared_lock:
+            self._prepared_cursors[key] = (cnx, cursor)
+            while len(self._prepared_cursors) > PREPARED_CACHE_SIZE:
+                # The evicted connection may be checked out by another thread,
+                # so the cursor is dropped rather than closed
+                self._prepared_cursors.popitem(last=False)
+        return cursor
+
+    def _discard_prepared_cursor(self, conn, query: str, dictionary: bool):
+        """Forget a cached prepared cursor (e.g. its statement went stale after a reconnect)"""
+        cnx = getattr(conn, '_cnx', conn)
+        with self._prepared_lock:
+            self._prepared_cursors.pop((id(cnx), query, dictionary), None)
+
+    def _execute(self, conn, query: str, params: Optional[tuple], prepared: bool, dictionary: bool):
+        """
+        Execute query on conn and return the cursor
+
+        A cached prepared statement that went stale (unknown handler or lost
+        connection) is re-prepared and run once more; other errors are raised.
+        """
+        if not (prepared and self.reuse_prepared):
+            cursor = conn.cursor(dictionary=dictionary)
+            cursor.execute(query, params or ())
+            return cursor
+
+        cursor = self._prepared_cursor(conn, query, dictionary)
+        try:
+            cursor.execute(query, params or ())
+        except mysql.connector.Error as e:
+            if e.errno not in _STALE_STATEMENT_ERRORS | _LOST_CONNECTION_ERRORS:
+                raise
+            self._discard_prepared_cursor(conn, query, dictionary)
+            if e.errno in _LOST_CONNECTION_ERRORS:
+                conn.reconnect(attempts=1)
+            cursor = self._prepared_cursor(conn, query, dictionary)
+            cursor.execute(query, params or ())
+        return cursor
+
+    def execute_query(self, query: str, params: Optional[tuple] = None, fetch_one: bool = False,
+                      prepared: bool = False, dict_rows: bool = True) -> List[Dict]:
+        """
+        Execute a SELECT query and return results as list of dictionaries
+
+        With dict_rows=False rows are plain tuples, for callers that unpack
+        columns by position.
+        """
         conn = None
         try:
             conn = self.get_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, params or ())
+            cursor = self._execute(conn, query, params, prepared, dictionary=dict_rows)
 
             if fetch_one:
                 result = cursor.fetchone()
@@ -57,13 +152,44 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def execute_query_df(self, query: str, params: Optional[tuple] = None,
+                         prepared: bool = False) -> pd.DataFrame:
+        """Execute a SELECT query and return the rows as a DataFrame"""
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = self._execute(conn, query, params, prepared, dictionary=False)
+            # Tuple rows straight into columns, without building a dict per row
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=cursor.column_names)
+        except Exception as e:
+            print(f"Database error: {e}")
+            return pd.DataFrame()
+        finally:
+            if conn:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor whose statements are committed together (rolled back on error)"""
+        conn = self.get_connection()
+        try:
+            conn.start_transaction()
+            cursor = conn.cursor()
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
     def execute_update(self, query: str, params: Optional[tuple] = None) -> int:
         """Execute an INSERT/UPDATE/DELETE query and return lastrowid"""
         conn = None
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
+            # Never the prepared path: its retry after a lost connection could repeat a write
+            cursor = self._execute(conn, query, params, prepared=False, dictionary=False)
             return cursor.lastrowid
         except Exception as e:
             print(f"Database update error: {e}")
@@ -72,48 +198,98 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
+    def execute_many(self, query: str, seq_of_params: List[tuple]) -> Optional[int]:
+        """Execute an INSERT/UPDATE for many parameter rows in one transaction and return rowcount"""
+        if not seq_of_params:
+            return 0
+        try:
+            with self.transaction() as cursor:
+                # INSERT ... VALUES is sent as a single multi-row statement
+                cursor.executemany(query, seq_of_params)
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Database update error: {e}")
+            return None
+
+
+@st.cache_resource
+def get_db() -> DatabaseManager:
+    """Get the process-wide DatabaseManager (one connection pool shared by all sessions)"""
+    return DatabaseManager()
+
+
+# Seeded demo accounts (see ensure_demo_users), served without a database round trip
+_DEMO_USERS = {
+    'doctor@demo.com': {
+        'id': 1,
+        'email': 'doctor@demo.com',
+        'role': 'doctor',
+        'first_name': 'Dr. Sarah',
+        'last_name': 'Johnson'
+    },
+    'patient@demo.com': {
+        'id': 2,
+        'email': 'patient@demo.com',
+        'role': 'patient',
+        'first_name': 'Maria',
+        'last_name': 'Garcia'
+    },
+}
+
 
 # User related queries
 def authenticate_user(email: str, password: str) -> Optional[Dict]:
     """
     Authenticate user with password verification
-    For demo: accepts demo credentials with simple hash check
+    For demo: accepts demo credentials and legacy plain-text rows
+    (legacy rows are rehashed with bcrypt on login; the hash is never returned)
     """
-    import hashlib
+    from utils.auth_helpers import verify_password, needs_rehash, hash_password
+
+    if password == 'password' and email in _DEMO_USERS:
+        return dict(_DEMO_USERS[email])
 
-    db = DatabaseManager()
+    db = get_db()
     query = """
         SELECT id, email, password, role, first_name, last_name
         FROM users
         WHERE email = %s
     """
-    result = db.execute_query(query, (email,), fetch_one=True)
+    result = db.execute_query(query, (email,), fetch_one=True, prepared=True)
 
     if result:
-        # For demo credentials, use simple hash verification
-        stored_hash = hashlib.sha256(password.encode()).hexdigest()
-        # Also allow direct comparison for existing users
-        if (result['password'] == stored_hash or
-            result['password'] == password or
-            password == 'password'):  # Demo override
+        # bcrypt, legacy SHA-256 or legacy plain-text, chosen by the stored format
+        stored_password = result.pop('password')
+        if verify_password(password, stored_password):
+            # Upgrade legacy rows to bcrypt on successful login
+            if needs_rehash(stored_password):
+                update_user_password(result['id'], hash_password(password))
             return result
     return None
 
 
 def get_user_by_id(user_id: int) -> Optional[Dict]:
     """Get user by ID"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         SELECT id, email, role, first_name, last_name, created_at
         FROM users
         WHERE id = %s
     """
-    return db.execute_query(query, (user_id,), fetch_one=True)
+    return db.execute_query(query, (user_id,), fetch_one=True, prepared=True)
+
+
+def update_user_password(user_id: int, password_hash: str) -> bool:
+    """Replace a user's stored password hash"""
+    db = get_db()
+    query = "UPDATE users SET password = %s WHERE id = %s"
+    result = db.execute_update(query, (password_hash, user_id))
+    return result is not None
 
 
 def create_user(email: str, password: str, role: str, first_name: str, last_name: str) -> Optional[int]:
     """Create a new user"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         INSERT INTO users (email, password, role, first_name, last_name)
         VALUES (%s, %s, %s, %s, %s)
@@ -124,20 +300,18 @@ def create_user(email: str, password: str, role: str, first_name: str, last_name
 # Conversation related queries
 def get_conversations_by_user(user_id: int, user_role: str) -> List[Dict]:
     """Get all conversations for a user"""
-    db = DatabaseManager()
+    db = get_db()
     if user_role == 'doctor':
         query = """
             SELECT c.*,
                    u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
                    u2.first_name as patient_first_name, u2.last_name as patient_last_name,
-                   COUNT(m.id) as message_count,
-                   EXISTS(SELECT 1 FROM summaries s WHERE s.conversation_id = c.id) as has_summary
+                   s.conversation_id IS NOT NULL as has_summary
             FROM conversations c
             JOIN users u1 ON c.doctor_id = u1.id
             JOIN users u2 ON c.patient_id = u2.id
-            LEFT JOIN messages m ON c.id = m.conversation_id
+            LEFT JOIN summaries s ON c.id = s.conversation_id
             WHERE c.doctor_id = %s
-            GROUP BY c.id
             ORDER BY c.created_at DESC
         """
     else:
@@ -145,22 +319,21 @@ def get_conversations_by_user(user_id: int, user_role: str) -> List[Dict]:
             SELECT c.*,
                    u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
                    u2.first_name as patient_first_name, u2.last_name as patient_last_name,
-                   COUNT(m.id) as message_count,
-                   EXISTS(SELECT 1 FROM summaries s WHERE s.conversation_id = c.id) as has_summary
+                   s.conversation_id IS NOT NULL as has_summary
             FROM conversations c
             JOIN users u1 ON c.doctor_id = u1.id
             JOIN users u2 ON c.patient_id = u2.id
-            LEFT JOIN messages m ON c.id = m.conversation_id
+            LEFT JOIN summaries s ON c.id = s.conversation_id
             WHERE c.patient_id = %s
-            GROUP BY c.id
             ORDER BY c.created_at DESC
         """
+    # message_count is a column on conversations, maintained by triggers on messages
     return db.execute_query(query, (user_id,))
 
 
 def get_conversation_by_id(conversation_id: int, user_id: int) -> Optional[Dict]:
     """Get conversation by ID with access check"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         SELECT c.*,
                u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
@@ -175,7 +348,7 @@ def get_conversation_by_id(conversation_id: int, user_id: int) -> Optional[Dict]
 
 def create_conversation(doctor_id: int, patient_id: int, patient_language: str, title: str) -> Optional[int]:
     """Create a new conversation"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         INSERT INTO conversations (doctor_id, patient_id, doctor_language, patient_language, title, status)
         VALUES (%s, %s, 'en', %s, %s, 'active')
@@ -185,7 +358,7 @@ def create_conversation(doctor_id: int, patient_id: int, patient_language: str,
 
 def get_active_conversation(doctor_id: int, patient_id: int) -> Optional[Dict]:
     """Get active conversation between doctor and patient"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         SELECT c.*,
                u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
@@ -200,18 +373,55 @@ def get_active_conversation(doctor_id: int, patient_id: int) -> Optional[Dict]:
     return db.execute_query(query, (doctor_id, patient_id), fetch_one=True)
 
 
+def get_conversation_stamp(conversation_id: int) -> Optional[Tuple]:
+    """
+    Get (message_count, summary generated_at) for a conversation
+
+    Changes whenever a message or summary is written by either backend,
+    so cached reads are keyed on it instead of being cleared on writes.
+    """
+    db = get_db()
+    query = """
+        SELECT c.message_count, s.generated_at
+        FROM conversations c
+        LEFT JOIN summaries s ON c.id = s.conversation_id
+        WHERE c.id = %s
+    """
+    return db.execute_query(query, (conversation_id,), fetch_one=True, prepared=True, dict_rows=False)
+
+
+def get_conversations_stamp(user_id: int, user_role: str) -> Optional[Tuple]:
+    """Get a tuple that changes whenever any of a user's conversations, their messages or summaries change"""
+    db = get_db()
+    if user_role == 'doctor':
+        query = """
+            SELECT COUNT(*), SUM(c.message_count), MAX(c.updated_at), COUNT(s.id), MAX(s.generated_at)
+            FROM conversations c
+            LEFT JOIN summaries s ON c.id = s.conversation_id
+            WHERE c.doctor_id = %s
+        """
+    else:
+        query = """
+            SELECT COUNT(*), SUM(c.message_count), MAX(c.updated_at), COUNT(s.id), MAX(s.generated_at)
+            FROM conversations c
+            LEFT JOIN summaries s ON c.id = s.conversation_id
+            WHERE c.patient_id = %s
+        """
+    return db.execute_query(query, (user_id,), fetch_one=True, prepared=True, dict_rows=False)
+
+
 def update_conversation_status(conversation_id: int, status: str) -> bool:
     """Update conversation status"""
-    db = DatabaseManager()
+    db = get_db()
     query = "UPDATE conversations SET status = %s WHERE id = %s"
     result = db.execute_update(query, (status, conversation_id))
     return result is not None
 
 
 # Message related queries
-def get_messages_by_conversation(conversation_id: int) -> List[Dict]:
-    """Get all messages for a conversation"""
-    db = DatabaseManager()
+def get_messages_by_conversation(conversation_id: int) -> pd.DataFrame:
+    """Get all messages for a conversation (one row per message, oldest first)"""
+    db = get_db()
     query = """
         SELECT m.*,
                u.first_name as sender_first_name,
@@ -221,13 +431,13 @@ def get_messages_by_conversation(conversation_id: int) -> List[Dict]:
         WHERE m.conversation_id = %s
         ORDER BY m.created_at ASC
     """
-    return db.execute_query(query, (conversation_id,))
+    return db.execute_query_df(query, (conversation_id,), prepared=True)
 
 
 def create_message(conversation_id: int, sender_id: int, sender_role: str,
                    original_text: str, translated_text: str, message_type: str = 'text') -> Optional[int]:
-    """Create a new message"""
-    db = DatabaseManager()
+    """Create a new message (conversations.message_count is bumped by a trigger)"""
+    db = get_db()
     query = """
         INSERT INTO messages (conversation_id, sender_id, sender_role, original_text, translated_text, message_type)
         VALUES (%s, %s, %s, %s, %s, %s)
@@ -239,7 +449,7 @@ def create_message(conversation_id: int, sender_id: int, sender_role: str,
 # Summary related queries
 def get_summary_by_conversation(conversation_id: int) -> Optional[Dict]:
     """Get summary for a conversation"""
-    db = DatabaseManager()
+    db = get_db()
     query = "SELECT * FROM summaries WHERE conversation_id = %s"
     return db.execute_query(query, (conversation_id,), fetch_one=True)
 
@@ -248,7 +458,7 @@ def create_summary(conversation_id: int, content: str, generated_by: int,
                    symptoms: str = None, diagnosis: str = None,
                    medications: str = None, follow_up_actions: str = None) -> Optional[int]:
     """Create a summary for a conversation"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         INSERT INTO summaries (conversation_id, content, symptoms, diagnosis, medications, follow_up_actions, generated_by)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
@@ -265,58 +475,123 @@ def create_summary(conversation_id: int, content: str, generated_by: int,
 
 
 # Search functionality
+
+# Words shorter than InnoDB's innodb_ft_min_token_size (default 3) are not indexed
+FT_MIN_TOKEN_SIZE = 3
+
+# Han, kana and Hangul: the default FULLTEXT parser splits on spaces only, so a
+# zh/ja/ko sentence is indexed as one token and mid-sentence words never match
+_UNSPACED_SCRIPT_RE = re.compile(
+    "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+    "\u1100-\u11ff\u3130-\u318f\uac00-\ud7af\uff66-\uff9f]"
+)
+
+
+def _fulltext_query(search_term: str) -> str:
+    """
+    Build a BOOLEAN MODE query requiring every word of the term as a prefix
+
+    Returns '' when the term has no words, any word is too short to be
+    indexed or the term contains CJK text the index cannot split into
+    words; callers then use LIKE.
+    """
+    if _UNSPACED_SCRIPT_RE.search(search_term):
+        return ""
+    words = re.findall(r"\w+", search_term)
+    if not words or any(len(word) < FT_MIN_TOKEN_SIZE for word in words):
+        return ""
+    return " ".join(f"+{word}*" for word in words)
+
+
 def search_conversations(user_id: int, user_role: str, search_term: str) -> List[Dict]:
-    """Search conversations by term"""
-    db = DatabaseManager()
+    """Search conversations by term (LIKE on title and names, FULLTEXT on messages)"""
+    db = get_db()
     search_pattern = f"%{search_term}%"
+    fulltext_query = _fulltext_query(search_term)
 
     if user_role == 'doctor':
-        query = """
-            SELECT DISTINCT c.*,
-                   u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
-                   u2.first_name as patient_first_name, u2.last_name as patient_last_name,
-                   COUNT(m.id) as message_count
-            FROM conversations c
-            JOIN users u1 ON c.doctor_id = u1.id
-            JOIN users u2 ON c.patient_id = u2.id
-            LEFT JOIN messages m ON c.id = m.conversation_id
-            WHERE c.doctor_id = %s
-              AND (c.title LIKE %s
-                   OR u2.first_name LIKE %s
-                   OR u2.last_name LIKE %s
-                   OR m.original_text LIKE %s
-                   OR m.translated_text LIKE %s)
-            GROUP BY c.id
-            ORDER BY c.created_at DESC
-        """
+        owner, other = 'c.doctor_id', 'u2'
     else:
-        query = """
-            SELECT DISTINCT c.*,
-                   u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
-                   u2.first_name as patient_first_name, u2.last_name as patient_last_name,
-                   COUNT(m.id) as message_count
-            FROM conversations c
-            JOIN users u1 ON c.doctor_id = u1.id
-            JOIN users u2 ON c.patient_id = u2.id
-            LEFT JOIN messages m ON c.id = m.conversation_id
-            WHERE c.patient_id = %s
-              AND (c.title LIKE %s
-                   OR u1.first_name LIKE %s
-                   OR u1.last_name LIKE %s
-                   OR m.original_text LIKE %s
-                   OR m.translated_text LIKE %s)
-            GROUP BY c.id
-            ORDER BY c.created_at DESC
-        """
+        owner, other = 'c.patient_id', 'u1'
+
+    if fulltext_query:
+        message_match = "MATCH(mt.original_text, mt.translated_text) AGAINST (%s IN BOOLEAN MODE)"
+        message_params = (fulltext_query,)
+    else:
+        # Unindexable term: fall back to scanning message text
+        message_match = "mt.original_text LIKE %s OR mt.translated_text LIKE %s"
+        message_params = (search_pattern, search_pattern)
+    params = (user_id, search_pattern, search_pattern, search_pattern, *message_params)
+
+    # The message subquery is uncorrelated, so MySQL materializes it once
+    # instead of re-running the search for every conversation
+    query = f"""
+        SELECT c.*,
+               u1.first_name as doctor_first_name, u1.last_name as doctor_last_name,
+               u2.first_name as patient_first_name, u2.last_name as patient_last_name,
+               EXISTS(SELECT 1 FROM summaries s WHERE s.conversation_id = c.id) as has_summary
+        FROM conversations c
+        JOIN users u1 ON c.doctor_id = u1.id
+        JOIN users u2 ON c.patient_id = u2.id
+        WHERE {owner} = %s
+          AND (c.title LIKE %s
+               OR {other}.first_name LIKE %s
+               OR {other}.last_name LIKE %s
+               OR c.id IN (SELECT mt.conversation_id FROM messages mt
+                           WHERE {message_match}))
+        ORDER BY c.created_at DESC
+    """
+    return db.execute_query(query, params)
+
+
+# Translation cache queries
+def get_cached_translations(text_hashes: List[str], source_lang: str, target_lang: str,
+                            retention_days: int) -> Dict[str, str]:
+    """Get persisted translations younger than retention_days as {text_hash: translated_text}"""
+    if not text_hashes:
+        return {}
+    db = get_db()
+    placeholders = ", ".join(["%s"] * len(text_hashes))
+    query = f"""
+        SELECT text_hash, translated_text
+        FROM translation_cache
+        WHERE source_language = %s AND target_language = %s
+          AND text_hash IN ({placeholders})
+          AND created_at >= NOW() - INTERVAL %s DAY
+    """
+    rows = db.execute_query(query, (source_lang, target_lang, *text_hashes, retention_days), dict_rows=False)
+    return dict(rows or [])
+
+
+def save_cached_translations(rows: List[Tuple[str, str, str, str, str, Optional[int]]]) -> Optional[int]:
+    """
+    Persist translations so other processes and restarts can reuse them
+
+    Each row is (text_hash, source_lang, target_lang, source_text, translated_text,
+    conversation_id); rows tied to a conversation are deleted with it.
+    """
+    db = get_db()
+    query = """
+        INSERT INTO translation_cache
+            (text_hash, source_language, target_language, source_text, translated_text, conversation_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+        translated_text = VALUES(translated_text)
+    """
+    return db.execute_many(query, rows)
+
 
-    return db.execute_query(query, (user_id, search_pattern, search_pattern,
-                                     search_pattern, search_pattern, search_pattern))
+def prune_cached_translations(retention_days: int) -> Optional[int]:
+    """Delete persisted translations older than retention_days"""
+    db = get_db()
+    query = "DELETE FROM translation_cache WHERE created_at < NOW() - INTERVAL %s DAY"
+    return db.execute_update(query, (retention_days,))
 
 
 # Get all patients (for doctor to select from)
 def get_all_patients() -> List[Dict]:
     """Get all patients in the system"""
-    db = DatabaseManager()
+    db = get_db()
     query = """
         SELECT id, email, first_name, last_name
         FROM users
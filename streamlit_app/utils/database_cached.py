@@ -0,0 +1,47 @@
+"""
+Cached read helpers for the Healthcare Translation App
+Wraps hot queries with st.cache_data so Streamlit reruns are served from memory.
+Entries are keyed on a stamp read from the data (see get_conversation_stamp and
+get_conversations_stamp), so a write from any session or backend yields a new
+key and other entries stay cached.
+"""
+import pandas as pd
+import streamlit as st
+from typing import List, Dict, Optional, Tuple
+from utils.database import (
+    get_messages_by_conversation,
+    get_summary_by_conversation,
+    get_conversations_by_user,
+    search_conversations,
+    get_all_patients
+)
+
+
+@st.cache_data(ttl=30, max_entries=1000, show_spinner=False)
+def cached_messages(conversation_id: int, stamp: Optional[Tuple]) -> pd.DataFrame:
+    """Get messages for a conversation; stamp is the conversation stamp"""
+    return get_messages_by_conversation(conversation_id)
+
+
+@st.cache_data(ttl=30, max_entries=1000, show_spinner=False)
+def cached_summary(conversation_id: int, stamp: Optional[Tuple]) -> Optional[Dict]:
+    """Get summary for a conversation; stamp is the conversation stamp"""
+    return get_summary_by_conversation(conversation_id)
+
+
+@st.cache_data(ttl=30, max_entries=1000, show_spinner=False)
+def cached_conversations(user_id: int, user_role: str, stamp: Optional[Tuple]) -> List[Dict]:
+    """Get all conversations for a user; stamp is the user's conversations stamp"""
+    return get_conversations_by_user(user_id, user_role)
+
+
+@st.cache_data(ttl=30, max_entries=1000, show_spinner=False)
+def cached_search(user_id: int, user_role: str, search_term: str, stamp: Optional[Tuple]) -> List[Dict]:
+    """Search a user's conversations; repeated terms are served from memory"""
+    return search_conversations(user_id, user_role, search_term)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_patients() -> List[Dict]:
+    """Get all patients (effectively static during a session)"""
+    return get_all_patients()
@@ -0,0 +1,19 @@
+"""
+Formatting helpers for the Healthcare Translation App
+"""
+from datetime import datetime
+from typing import Optional, Union
+
+
+def parse_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """
+    Parse a database timestamp (datetime or 'YYYY-MM-DD HH:MM:SS' string)
+
+    Uses the C-level fromisoformat rather than strptime, which re-parses
+    the format string on every call.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
@@ -3,12 +3,49 @@ Translation service for the Healthcare Translation App
 Uses MyMemory Translation API (free tier)
 """
 import os
+import hashlib
+import threading
+import time
 import requests
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from utils.database import get_cached_translations, save_cached_translations, prune_cached_translations
 
 load_dotenv()
 
+# MyMemory's free /get endpoint limits q to 500 bytes (UTF-8): longer texts are
+# rejected before any request, and batches are budgeted in bytes
+MAX_BATCH_BYTES = 500
+
+# Keep-alive connection pool for the MyMemory session
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+
+# Concurrent requests per translate_texts call (kept below HTTP_POOL_MAXSIZE)
+TRANSLATION_WORKERS = 8
+_translation_executor = ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix='translate')
+
+# Separator used to pack several texts into a single translation request
+BATCH_SEPARATOR = "\n\u241f\n"
+
+# In-process LRU of successful translations keyed on (text, target, source)
+TRANSLATION_CACHE_SIZE = 4096
+_translation_cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+_translation_cache_lock = threading.Lock()
+
+# Second cache tier shared by all processes (translation_cache table). Off by default:
+# the table holds message text, so rows are tied to their conversation and expire
+PERSIST_TRANSLATIONS = os.getenv('TRANSLATION_CACHE_DB', 'false').lower() == 'true'
+TRANSLATION_CACHE_RETENTION_DAYS = int(os.getenv('TRANSLATION_CACHE_RETENTION_DAYS', 30))
+# Seconds between deletes of expired rows (per process)
+TRANSLATION_CACHE_PRUNE_INTERVAL = 3600
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
 # Supported languages
 SUPPORTED_LANGUAGES = [
     {"code": "en", "name": "English"},
@@ -27,6 +64,10 @@ SUPPORTED_LANGUAGES = [
     {"code": "nl", "name": "Dutch"},
 ]
 
+# Lookup tables built once from SUPPORTED_LANGUAGES
+_CODE_TO_NAME = {lang['code']: lang['name'] for lang in SUPPORTED_LANGUAGES}
+_NAME_TO_CODE = {lang['name']: lang['code'] for lang in SUPPORTED_LANGUAGES}
+
 
 class TranslationService:
     """Handles translation using MyMemory API"""
@@ -34,31 +75,63 @@ class TranslationService:
     def __init__(self):
         self.api_url = "https://api.mymemory.translated.net/get"
         self.email = os.getenv('MYMEMORY_API_EMAIL', '')
+        # One process-wide session so the TLS connection is kept alive across calls
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            # No read retries: a hung call must not hold the script thread for several timeouts
+            max_retries=Retry(total=2, read=0, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+        ))
 
-    def translate(self, text: str, target_lang: str, source_lang: str = 'auto') -> Dict:
+    def translate(self, text: str, target_lang: str, source_lang: str = 'auto',
+                  conversation_id: Optional[int] = None) -> Dict:
         """
-        Translate text to target language
+        Translate text to target language (cache first: memory, then database)
 
         Args:
             text: Text to translate
             target_lang: Target language code (e.g., 'es', 'en')
             source_lang: Source language code (default: 'auto' for auto-detection)
+            conversation_id: Conversation the text belongs to (persisted rows are deleted with it)
 
         Returns:
             Dictionary with translation result
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return {
                 'success': False,
                 'error': 'No text provided for translation'
             }
 
-        if len(text) > 2000:
+        key = text.strip()
+        if len(key.encode()) > MAX_BATCH_BYTES:
             return {
                 'success': False,
-                'error': 'Text exceeds maximum length of 2000 characters'
+                'error': f'Text exceeds maximum length of {MAX_BATCH_BYTES} bytes (UTF-8)'
             }
 
+        cached = _cache_get(key, target_lang, source_lang)
+        if cached is None and PERSIST_TRANSLATIONS:
+            cached = _load_persisted([key], target_lang, source_lang).get(key)
+        if cached is not None:
+            return {
+                'success': True,
+                'original_text': text,
+                'translated_text': cached,
+                'source_language': source_lang if source_lang != 'auto' else 'auto-detected',
+                'target_language': target_lang,
+                'matches': [],
+                'cached': True
+            }
+
+        result = self._request(key, target_lang, source_lang)
+        if result['success']:
+            _remember([(key, result['translated_text'])], target_lang, source_lang, conversation_id)
+        return result
+
+    def _request(self, text: str, target_lang: str, source_lang: str) -> Dict:
+        """Send one translation request to MyMemory (no caching)"""
         # Build API request
         params = {
             'q': text,
@@ -69,7 +142,7 @@ class TranslationService:
             params['email'] = self.email
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 self.api_url,
                 params=params,
                 timeout=5
@@ -131,7 +204,8 @@ class TranslationService:
 translation_service = TranslationService()
 
 
-def translate_text(text: str, target_lang: str, source_lang: str = 'en') -> str:
+def translate_text(text: str, target_lang: str, source_lang: str = 'en',
+                   conversation_id: Optional[int] = None) -> str:
     """
     Convenience function to translate text
 
@@ -139,26 +213,178 @@ def translate_text(text: str, target_lang: str, source_lang: str = 'en') -> str:
         text: Text to translate
         target_lang: Target language code
         source_lang: Source language code
+        conversation_id: Conversation the text belongs to (persisted rows are deleted with it)
 
     Returns:
         Translated text or original if translation fails
     """
-    result = translation_service.translate(text, target_lang, source_lang)
-    if result['success']:
-        return result['translated_text']
+    # Shares the LRU with translate_texts, so repeated phrases skip the API
+    return translate_texts([text], target_lang, source_lang, conversation_id)[0]
+
+
+def _cache_get(text: str, target_lang: str, source_lang: str) -> Optional[str]:
+    """Look up a cached translation and mark it as recently used"""
+    key = (text, target_lang, source_lang)
+    with _translation_cache_lock:
+        translated = _translation_cache.get(key)
+        if translated is not None:
+            _translation_cache.move_to_end(key)
+        return translated
+
+
+def _cache_put(text: str, target_lang: str, source_lang: str, translated: str):
+    """Store a translation, evicting the least recently used entry when full"""
+    with _translation_cache_lock:
+        _translation_cache[(text, target_lang, source_lang)] = translated
+        _translation_cache.move_to_end((text, target_lang, source_lang))
+        while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+
+
+def _text_hash(text: str) -> str:
+    """Key used for the translation_cache table"""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _remember(translations: List[Tuple[str, str]], target_lang: str, source_lang: str,
+              conversation_id: Optional[int] = None):
+    """Store successful (text, translated) pairs in every cache tier"""
+    for text, translated in translations:
+        _cache_put(text, target_lang, source_lang, translated)
+    if PERSIST_TRANSLATIONS and translations:
+        # One multi-row upsert instead of an INSERT per text
+        save_cached_translations([
+            (_text_hash(text), source_lang, target_lang, text, translated, conversation_id)
+            for text, translated in translations
+        ])
+        _prune_persisted()
+
+
+def _prune_persisted():
+    """Delete expired translation_cache rows, at most once per TRANSLATION_CACHE_PRUNE_INTERVAL"""
+    global _last_prune
+    now = time.monotonic()
+    with _prune_lock:
+        if _last_prune and now - _last_prune < TRANSLATION_CACHE_PRUNE_INTERVAL:
+            return
+        _last_prune = now
+    prune_cached_translations(TRANSLATION_CACHE_RETENTION_DAYS)
+
+
+def _load_persisted(texts: List[str], target_lang: str, source_lang: str) -> Dict[str, str]:
+    """Fetch persisted translations for texts in one query and promote them to memory"""
+    hashes = {_text_hash(text): text for text in texts}
+    found = {}
+    persisted = get_cached_translations(list(hashes), source_lang, target_lang, TRANSLATION_CACHE_RETENTION_DAYS)
+    for text_hash, translated in persisted.items():
+        text = hashes[text_hash]
+        _cache_put(text, target_lang, source_lang, translated)
+        found[text] = translated
+    return found
+
+
+def _chunk_for_batch(texts: List[str]) -> List[List[str]]:
+    """Group texts (each within MAX_BATCH_BYTES) so each joined request stays within MAX_BATCH_BYTES"""
+    separator_bytes = len(BATCH_SEPARATOR.encode())
+    chunks, current, current_len = [], [], 0
+    for text in texts:
+        text_bytes = len(text.encode())
+        added_len = text_bytes + (separator_bytes if current else 0)
+        if current and current_len + added_len > MAX_BATCH_BYTES:
+            chunks.append(current)
+            current, current_len = [], 0
+            added_len = text_bytes
+        current.append(text)
+        current_len += added_len
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _translate_chunk(chunk: List[str], target_lang: str, source_lang: str) -> List[str]:
+    """Translate a chunk of texts with one request, falling back to one request per text"""
+    if len(chunk) > 1:
+        result = translation_service._request(BATCH_SEPARATOR.join(chunk), target_lang, source_lang)
+        if result['success']:
+            parts = [part.strip() for part in result['translated_text'].split(BATCH_SEPARATOR.strip())]
+            if len(parts) == len(chunk):
+                return parts
+
+    translations = []
+    for text in chunk:
+        result = translation_service._request(text, target_lang, source_lang)
+        if not result['success']:
+            print(f"Translation error: {result.get('error')}")
+            translations.append(None)
+        else:
+            translations.append(result['translated_text'])
+    return translations
+
+
+def translate_texts(texts: List[str], target_lang: str, source_lang: str = 'en',
+                    conversation_id: Optional[int] = None) -> List[str]:
+    """
+    Translate several texts with as few API calls as possible
+
+    Texts are packed into BATCH_SEPARATOR-joined requests which are sent
+    concurrently; cached translations (keyed on the stripped text, looked
+    up in memory and then in one database query) and empty texts never
+    reach the network.
+
+    Args:
+        texts: Texts to translate
+        target_lang: Target language code
+        source_lang: Source language code
+        conversation_id: Conversation the texts belong to (persisted rows are deleted with it)
+
+    Returns:
+        Translated texts in input order (original text where translation fails)
+    """
+    keys = [text.strip() if text else '' for text in texts]
+    # Results come from this local map; the shared, bounded LRU may evict entries mid-call
+    translated: Dict[str, str] = {}
+    pending = []
+    for key in dict.fromkeys(keys):
+        if not key:
+            continue
+        cached = _cache_get(key, target_lang, source_lang)
+        if cached is not None:
+            translated[key] = cached
+            continue
+        if len(key.encode()) > MAX_BATCH_BYTES:
+            # MyMemory would reject it anyway; keep the original without a request
+            print(f"Translation error: text exceeds maximum length of {MAX_BATCH_BYTES} bytes (UTF-8)")
+            continue
+        pending.append(key)
+    if pending and PERSIST_TRANSLATIONS:
+        translated.update(_load_persisted(pending, target_lang, source_lang))
+        pending = [key for key in pending if key not in translated]
+
+    chunks = _chunk_for_batch(pending)
+    if len(chunks) > 1:
+        translated_chunks = _translation_executor.map(
+            lambda chunk: _translate_chunk(chunk, target_lang, source_lang), chunks)
     else:
-        print(f"Translation error: {result.get('error')}")
-        return text  # Return original text on failure
+        translated_chunks = [_translate_chunk(chunk, target_lang, source_lang) for chunk in chunks]
+
+    fresh = [
+        (text, translation)
+        for chunk, translations in zip(chunks, translated_chunks)
+        for text, translation in zip(chunk, translations)
+        if translation is not None
+    ]
+    translated.update(fresh)
+    # Workers only do HTTP; cache writes (including the database tier) stay on this thread
+    _remember(fresh, target_lang, source_lang, conversation_id)
+
+    return [translated.get(key, text) for key, text in zip(keys, texts)]
 
 
 def get_language_name(code: str) -> str:
     """Get language name from code"""
-    for lang in SUPPORTED_LANGUAGES:
-        if lang['code'] == code:
-            return lang['name']
-    return code.capitalize()
+    return _CODE_TO_NAME.get(code) or code.capitalize()
 
 
 def get_language_options() -> Dict:
-    """Get language options as a dictionary for Streamlit selectbox"""
-    return {lang['name']: lang['code'] for lang in SUPPORTED_LANGUAGES}
+    """Get language options ({name: code}) for Streamlit selectbox (shared, do not modify)"""
+    return _NAME_TO_CODE
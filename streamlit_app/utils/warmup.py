@@ -0,0 +1,19 @@
+"""
+Startup warm-up for the Healthcare Translation App
+Pays one-time initialization costs before the first user action
+"""
+import os
+import streamlit as st
+from utils.database import get_db
+
+
+@st.cache_resource(show_spinner=False)
+def warm():
+    """Create the shared database pool once per process (set SKIP_WARMUP=1 to skip)"""
+    if os.getenv('SKIP_WARMUP', '').lower() in ('1', 'true', 'yes'):
+        return
+    try:
+        get_db()
+    except Exception as e:
+        # Leave initialization to the first query; the login page still renders
+        print(f"Warm-up error: {e}")